@@ -3,54 +3,108 @@
 from __future__ import annotations
 
 import argparse
-import contextlib
 import http.server
 import os
 import socket
-import threading
-import time
+import socketserver
 import webbrowser
+from http import HTTPStatus
 from pathlib import Path
 
 APP_ROOT = Path(__file__).resolve().parent
+DEFAULT_PORT = 8765
 HOSTED_ORIGIN = os.environ.get("BUDGET95_HOSTED_ORIGIN", "https://app.budgetbuilder95.com/")
 
 
 class SilentHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
     """Serve files without noisy console logging."""
 
+    _etag: str | None = None
+
     def __init__(self, *args, directory: str | None = None, **kwargs):
         super().__init__(*args, directory=directory or str(APP_ROOT), **kwargs)
 
     def log_message(self, format: str, *args) -> None:  # noqa: A003 - http.server API
         return
 
-
-def find_free_port(preferred: int | None = None) -> int:
-    """Locate an available TCP port, falling back from the preferred option."""
-
-    candidates = [preferred] if preferred else []
-    candidates += [8765, 8888, 0]
-    for port in candidates:
-        with contextlib.closing(socket.socket(socket.AF_INET, socket.SOCK_STREAM)) as sock:
+    def send_head(self):
+        """Answer conditional GETs with 304 when the file's ETag is unchanged."""
+
+        self._etag = None
+        path = self.translate_path(self.path)
+        try:
+            stat = os.stat(path) if os.path.isfile(path) else None
+        except OSError:
+            stat = None
+        if stat is not None:
+            self._etag = f'W/"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+            candidates = {tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")}
+            if self._etag in candidates or "*" in candidates:
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                self.end_headers()
+                return None
+        return super().send_head()
+
+    def end_headers(self) -> None:
+        if self._etag:
+            self.send_header("ETag", self._etag)
+            # Revalidate every time so edits to the bundle (and sw.js) show up immediately.
+            self.send_header("Cache-Control", "no-cache")
+        super().end_headers()
+
+    def copyfile(self, source, outputfile) -> None:
+        """Stream file bodies through the kernel's sendfile instead of Python buffers."""
+
+        if outputfile is self.wfile:
+            # socket.sendfile falls back to plain sends where os.sendfile is unavailable.
+            self.connection.sendfile(source)
+        else:
+            super().copyfile(source, outputfile)
+
+
+class LauncherHTTPServer(http.server.ThreadingHTTPServer):
+    """Threading HTTP server that adopts an already-bound listening socket."""
+
+    def __init__(self, sock: socket.socket, handler_class) -> None:
+        # Skip TCPServer.__init__, which would allocate a socket of its own.
+        socketserver.BaseServer.__init__(self, sock.getsockname(), handler_class)
+        self._adopted_socket = sock
+        self.server_bind()
+
+    def server_bind(self) -> None:
+        """Adopt the socket from bind_local_socket instead of binding a new one."""
+
+        self.socket = self._adopted_socket
+        self.server_address = self.socket.getsockname()
+        self.server_name, self.server_port = self.server_address[:2]
+
+    def server_activate(self) -> None:
+        """bind_local_socket already put the socket into listening mode."""
+
+
+def bind_local_socket(preferred: int | None = None) -> socket.socket:
+    """Bind and listen on a localhost TCP socket, letting the kernel pick a port if the preferred one is taken."""
+
+    for port in (preferred or DEFAULT_PORT, 0):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        if os.name == "nt":
+            # SO_REUSEADDR on Windows would let us share a port another process is listening on.
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_EXCLUSIVEADDRUSE, 1)
+        else:
             sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            try:
-                sock.bind(("127.0.0.1", port))
-            except OSError:
-                continue
-            return sock.getsockname()[1]
-    raise RuntimeError("Unable to find a free localhost port")
+        try:
+            sock.bind(("127.0.0.1", port))
+            sock.listen(LauncherHTTPServer.request_queue_size)
+        except OSError:
+            sock.close()
+            continue
+        return sock
+    raise RuntimeError("Unable to bind a localhost port")
 
 
-def run_server(port: int, ready_event: threading.Event) -> http.server.ThreadingHTTPServer:
+def create_server(sock: socket.socket) -> LauncherHTTPServer:
     handler = lambda *args, **kwargs: SilentHTTPRequestHandler(*args, directory=str(APP_ROOT), **kwargs)
-    server = http.server.ThreadingHTTPServer(("127.0.0.1", port), handler)  # type: ignore[arg-type]
-    ready_event.set()
-    try:
-        server.serve_forever(poll_interval=0.5)
-    finally:
-        server.server_close()
-    return server
+    return LauncherHTTPServer(sock, handler)
 
 
 def main() -> None:
@@ -59,7 +113,7 @@ def main() -> None:
         "--port",
         type=int,
         default=None,
-        help="Optional port to bind (defaults to the first free port starting at 8765).",
+        help="Optional port to bind (defaults to 8765, or any free port if that is taken).",
     )
     parser.add_argument(
         "--no-browser",
@@ -80,27 +134,25 @@ def main() -> None:
             webbrowser.open(HOSTED_ORIGIN)
         return
 
-    port = find_free_port(args.port)
+    sock = bind_local_socket(args.port)
+    port = sock.getsockname()[1]
     address = f"http://127.0.0.1:{port}/index.html"
 
-    ready = threading.Event()
-    server_thread = threading.Thread(target=run_server, args=(port, ready), daemon=True)
-    server_thread.start()
-    ready.wait()
-
-    print("Budget Builder desktop server running!", flush=True)
-    print(f"Serving from: {APP_ROOT}", flush=True)
-    print(f"Open in your browser at: {address}\n", flush=True)
+    server = create_server(sock)
+    try:
+        print("Budget Builder desktop server running!", flush=True)
+        print(f"Serving from: {APP_ROOT}", flush=True)
+        print(f"Open in your browser at: {address}\n", flush=True)
 
-    if not args.no_browser:
-        time.sleep(0.4)
-        webbrowser.open(address)
+        if not args.no_browser:
+            # The socket is already listening, so the browser's first request simply queues.
+            webbrowser.open(address)
 
-    try:
-        while server_thread.is_alive():
-            time.sleep(0.5)
+        server.serve_forever()
     except KeyboardInterrupt:
         print("\nShutting down Budget Builder desktop server…", flush=True)
+    finally:
+        server.server_close()
 
 
 if __name__ == "__main__":